@@ -0,0 +1,297 @@
+"""Numba kernels generating the adder and multiplier gate sequences.
+
+The gate sequences of the adder and multiplier are pure index arithmetic, so
+they can be generated by compiled loops instead of one Python call per gate.
+Each kernel returns the gates as two parallel arrays, the layout
+``utils.GateBuffer`` stores: a uint8 array of op codes (``OP_X``, ``OP_CX``
+or ``OP_CCX``) and an ``(M, 3)`` int32 array of qubit indices, where slots the
+gate does not use hold -1. ``render_ops`` turns such arrays into QASM text
+without creating a Python object per gate.
+
+Numba is optional (the ``numba`` extra). Without it the kernels still run as
+plain Python, only much slower than emitting the gates directly. With it,
+importing Numba and loading the cached kernels costs about a second per
+process, longer than the Python generators take for most circuits. Callers
+therefore import this module only when ``utils.NUMBA_AVAILABLE`` is set and
+the circuit is at least ``_NUMBA_MIN_BITS`` wide, the size from which the
+kernel was measured to be faster end to end in that generator's module.
+"""
+
+from collections.abc import Callable
+from typing import TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+_F = TypeVar("_F", bound=Callable[..., object])
+
+try:
+    from numba import njit  # type: ignore[import-untyped]
+except ImportError:
+
+    def njit(**_options: object) -> Callable[[_F], _F]:  # type: ignore[no-redef]
+        """Return a decorator leaving the function as it is.
+
+        Returns:
+            Callable: Identity decorator standing in for Numba's
+
+        """
+        return lambda func: func
+
+
+# The op code of each gate is also the number of leading "c"s in its name and
+# one less than its number of qubits, which render_ops relies on.
+OP_X = 0
+OP_CX = 1
+OP_CCX = 2
+
+_CHAR_C = ord("c")
+_CHAR_X = ord("x")
+_CHAR_SPACE = ord(" ")
+_CHAR_COMMA = ord(",")
+_CHAR_OPEN = ord("[")
+_CHAR_CLOSE = ord("]")
+_CHAR_SEMICOLON = ord(";")
+_CHAR_NEWLINE = ord("\n")
+_CHAR_ZERO = ord("0")
+_MAX_DIGITS = 10  # int32
+
+
+@njit(cache=True)
+def _gate(  # noqa: PLR0913, PLR0917
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    k: int,
+    op: int,
+    q0: int,
+    q1: int,
+    q2: int,
+) -> int:
+    ops[k] = op
+    qubits[k, 0] = q0
+    qubits[k, 1] = q1
+    qubits[k, 2] = q2
+    return k + 1
+
+
+@njit(cache=True)
+def _majority(  # noqa: PLR0913, PLR0917
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    k: int,
+    a: int,
+    b: int,
+    c: int,
+) -> int:
+    # Same gates as adder.apply_majority_gate
+    k = _gate(ops, qubits, k, OP_CX, c, b, -1)
+    k = _gate(ops, qubits, k, OP_CX, c, a, -1)
+    return _gate(ops, qubits, k, OP_CCX, a, b, c)
+
+
+@njit(cache=True)
+def _unmajority(  # noqa: PLR0913, PLR0917
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    k: int,
+    a: int,
+    b: int,
+    c: int,
+) -> int:
+    # Same gates as adder.undo_majority_gate
+    k = _gate(ops, qubits, k, OP_CCX, a, b, c)
+    k = _gate(ops, qubits, k, OP_CX, c, a, -1)
+    return _gate(ops, qubits, k, OP_CX, a, b, -1)
+
+
+@njit(cache=True)
+def build_adder_ops(
+    qubit_count: int,
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.int32]]:
+    """Generate the gates of adder.add_bits.
+
+    Args:
+        qubit_count: Number of bits for the quantum adder (a multiple of 4)
+
+    Returns:
+        tuple: (op codes, qubit indices) arrays
+
+    """
+    n_blocks = qubit_count // 4
+    ops = np.empty(25 * n_blocks, np.uint8)
+    qubits = np.empty((25 * n_blocks, 3), np.int32)
+    k = 0
+
+    for block in range(n_blocks):
+        i = block * 4
+        carry_in = qubit_count * 2 + block
+        carry_out = carry_in + 1
+
+        previous = carry_in
+        for j in range(4):
+            k = _majority(ops, qubits, k, previous, i + j + qubit_count, i + j)
+            previous = i + j
+
+        k = _gate(ops, qubits, k, OP_CX, i + 3, carry_out, -1)
+
+        for j in range(3, -1, -1):
+            previous = carry_in if j == 0 else i + j - 1
+            k = _unmajority(ops, qubits, k, previous, i + j + qubit_count, i + j)
+
+    return ops, qubits
+
+
+@njit(cache=True)
+def _carry(  # noqa: PLR0913, PLR0917
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    k: int,
+    c0: int,
+    a: int,
+    b: int,
+    c1: int,
+) -> int:
+    # Same gates as multiplier.carry
+    k = _gate(ops, qubits, k, OP_CCX, a, b, c1)
+    k = _gate(ops, qubits, k, OP_CX, a, b, -1)
+    return _gate(ops, qubits, k, OP_CCX, c0, b, c1)
+
+
+@njit(cache=True)
+def _uncarry(  # noqa: PLR0913, PLR0917
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    k: int,
+    c0: int,
+    a: int,
+    b: int,
+    c1: int,
+) -> int:
+    # Same gates as multiplier.uncarry
+    k = _gate(ops, qubits, k, OP_CCX, c0, b, c1)
+    k = _gate(ops, qubits, k, OP_CX, a, b, -1)
+    return _gate(ops, qubits, k, OP_CCX, a, b, c1)
+
+
+@njit(cache=True)
+def _carry_sum(  # noqa: PLR0913, PLR0917
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    k: int,
+    c0: int,
+    a: int,
+    b: int,
+) -> int:
+    # Same gates as multiplier.carry_sum
+    k = _gate(ops, qubits, k, OP_CX, a, b, -1)
+    return _gate(ops, qubits, k, OP_CX, c0, b, -1)
+
+
+@njit(cache=True)
+def build_multiplier_ops(
+    n: int,
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.int32]]:
+    """Generate the gates of multiplier.multiplier on qubits 0 .. 5n-1.
+
+    Qubit 3j is the carry c_j, 3j+1 the accumulator a_j, 3j+2 the result b_j,
+    3n+j the multiplicand y_j and 4n+i the multiplier x_i.
+
+    Args:
+        n: Number of bits for the multiplier
+
+    Returns:
+        tuple: (op codes, qubit indices) arrays
+
+    """
+    ops = np.empty(9 * n * n - 5 * n, np.uint8)
+    qubits = np.empty((9 * n * n - 5 * n, 3), np.int32)
+    k = 0
+
+    for i in range(n):
+        x_i = 4 * n + i
+
+        for j in range(n - i):
+            k = _gate(ops, qubits, k, OP_CCX, x_i, 3 * n + j, 3 * (i + j) + 1)
+
+        for j in range(n - 1):
+            k = _carry(ops, qubits, k, 3 * j, 3 * j + 1, 3 * j + 2, 3 * j + 3)
+        k = _carry_sum(ops, qubits, k, 3 * n - 3, 3 * n - 2, 3 * n - 1)
+        for j in range(n - 2, -1, -1):
+            k = _uncarry(ops, qubits, k, 3 * j, 3 * j + 1, 3 * j + 2, 3 * j + 3)
+            k = _carry_sum(ops, qubits, k, 3 * j, 3 * j + 1, 3 * j + 2)
+
+        for j in range(n - i):
+            k = _gate(ops, qubits, k, OP_CCX, x_i, 3 * n + j, 3 * (i + j) + 1)
+
+    return ops, qubits
+
+
+@njit(cache=True)
+def _put_qubit(
+    buf: npt.NDArray[np.uint8],
+    k: int,
+    qreg: npt.NDArray[np.uint8],
+    qubit: int,
+) -> int:
+    for char in qreg:
+        buf[k] = char
+        k += 1
+    buf[k] = _CHAR_OPEN
+    k += 1
+
+    n_digits = 1
+    rest = qubit // 10
+    while rest > 0:
+        n_digits += 1
+        rest //= 10
+    for i in range(n_digits - 1, -1, -1):
+        buf[k + i] = _CHAR_ZERO + qubit % 10
+        qubit //= 10
+    k += n_digits
+
+    buf[k] = _CHAR_CLOSE
+    return k + 1
+
+
+@njit(cache=True)
+def render_ops(
+    ops: npt.NDArray[np.uint8],
+    qubits: npt.NDArray[np.int32],
+    qreg: npt.NDArray[np.uint8],
+) -> npt.NDArray[np.uint8]:
+    """Render gates as QASM gate statements.
+
+    Args:
+        ops: Op code of each gate
+        qubits: (M, 3) array of the qubit indices of each gate
+        qreg: ASCII name of the qubit register as a uint8 array
+
+    Returns:
+        uint8 array holding the ASCII text, one statement per line
+
+    """
+    max_line = len("ccx ;\n, , ") + 3 * (len(qreg) + len("[]") + _MAX_DIGITS)
+    buf = np.empty(len(ops) * max_line, np.uint8)
+    k = 0
+
+    for row in range(len(ops)):
+        op = ops[row]
+        for _ in range(op):
+            buf[k] = _CHAR_C
+            k += 1
+        buf[k] = _CHAR_X
+        buf[k + 1] = _CHAR_SPACE
+        k += 2
+
+        for arg in range(op + 1):
+            if arg > 0:
+                buf[k] = _CHAR_COMMA
+                buf[k + 1] = _CHAR_SPACE
+                k += 2
+            k = _put_qubit(buf, k, qreg, qubits[row, arg])
+
+        buf[k] = _CHAR_SEMICOLON
+        buf[k + 1] = _CHAR_NEWLINE
+        k += 2
+
+    return buf[:k]
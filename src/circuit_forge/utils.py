@@ -1,14 +1,326 @@
 """Utility functions for Circuit Forge."""
 
+from collections.abc import Iterable, Mapping
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Literal
+from types import TracebackType
+from typing import TYPE_CHECKING, Literal, Protocol
 
-from qiskit import QuantumCircuit
-from qiskit.qasm3 import dumps  # type: ignore[import-untyped]
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
+
+# Qiskit is imported where a QuantumCircuit is actually used, so that writing
+# QASM with QasmStreamer does not pay for importing it.
+
+_QASM_DIR = Path("qasm")
+
+# Looked up without importing Numba; see circuit_forge._kernels
+NUMBA_AVAILABLE = find_spec("numba") is not None
+
+# Gate statement templates for a qubit register named "q" and a bit register
+# named "c"; QasmBuffer substitutes the actual register names once.
+_X_FMT = b"x q[%d];\n"
+_CX_FMT = b"cx q[%d], q[%d];\n"
+_CCX_FMT = b"ccx q[%d], q[%d], q[%d];\n"
+_M_FMT = b"c[%d] = measure q[%d];\n"
+
+
+class GateSink(Protocol):
+    """Anything the circuit generators can emit X, CX and CCX gates into."""
+
+    def x(self, qubit: int, /) -> object:
+        """Apply an X gate."""
+
+    def cx(self, control: int, target: int, /) -> object:
+        """Apply a CX gate."""
+
+    def ccx(self, control1: int, control2: int, target: int, /) -> object:
+        """Apply a CCX gate."""
+
+
+class CircuitAppender:
+    """Append gates to a quantum circuit without argument broadcasting.
+
+    ``QuantumCircuit.cx()`` and friends convert, validate and broadcast their
+    arguments on every call. The generators only ever apply single gates to
+    plain qubit indices, so this resolves the indices against the circuit's
+    qubit list and appends the instructions to the circuit data directly,
+    reusing one gate instance per gate type.
+    """
+
+    def __init__(self, qc: "QuantumCircuit") -> None:
+        """Wrap a quantum circuit.
+
+        Args:
+            qc: Quantum circuit to append gates to
+
+        """
+        from qiskit.circuit import CircuitInstruction  # noqa: PLC0415
+        from qiskit.circuit.library import CCXGate, CXGate, XGate  # noqa: PLC0415
+
+        self._instruction = CircuitInstruction
+        self._x = XGate()
+        self._cx = CXGate()
+        self._ccx = CCXGate()
+        self._qubits = qc.qubits
+        self._append = qc._data.append  # noqa: SLF001
+
+    def x(self, qubit: int) -> None:
+        """Apply an X gate to the given qubit index."""
+        self._append(self._instruction(self._x, (self._qubits[qubit],), ()))
+
+    def cx(self, control: int, target: int) -> None:
+        """Apply a CX gate to the given qubit indices."""
+        qubits = self._qubits
+        self._append(
+            self._instruction(self._cx, (qubits[control], qubits[target]), ()),
+        )
+
+    def ccx(self, control1: int, control2: int, target: int) -> None:
+        """Apply a CCX gate to the given qubit indices."""
+        qubits = self._qubits
+        self._append(
+            self._instruction(
+                self._ccx,
+                (qubits[control1], qubits[control2], qubits[target]),
+                (),
+            ),
+        )
+
+
+class QasmBuffer:
+    """OpenQASM 3 gate statements collected in a ``bytearray``.
+
+    A gate sink that formats each gate as a QASM statement as it is emitted.
+    ``QasmStreamer`` adds the header and the output file; on its own the
+    buffer holds a fragment that can be appended to another one with
+    ``extend()``.
+    """
+
+    def __init__(self, qubit_register: str = "q") -> None:
+        """Start an empty buffer.
+
+        Args:
+            qubit_register: Name of the qubit register
+
+        """
+        self._qreg = qubit_register
+        self._buf = bytearray()
+
+        q = qubit_register.encode("ascii") + b"["
+        self._x_fmt = _X_FMT.replace(b"q[", q)
+        self._cx_fmt = _CX_FMT.replace(b"q[", q)
+        self._ccx_fmt = _CCX_FMT.replace(b"q[", q)
+        self._m_fmt = _M_FMT.replace(b"q[", q)
+
+    def __bytes__(self) -> bytes:
+        """Return the QASM text collected so far.
+
+        Returns:
+            bytes: ASCII QASM text
+
+        """
+        return bytes(self._buf)
+
+    def extend(self, text: bytes) -> None:
+        """Append QASM text, such as another buffer's contents.
+
+        Args:
+            text: ASCII QASM statements
+
+        """
+        self._buf += text
+
+    def x(self, qubit: int) -> None:
+        """Write an X gate on the given qubit index."""
+        self._buf += self._x_fmt % qubit
+
+    def cx(self, control: int, target: int) -> None:
+        """Write a CX gate on the given qubit indices."""
+        self._buf += self._cx_fmt % (control, target)
+
+    def ccx(self, control1: int, control2: int, target: int) -> None:
+        """Write a CCX gate on the given qubit indices."""
+        self._buf += self._ccx_fmt % (control1, control2, target)
+
+    def write_gates(self, gates: "GateBuffer") -> None:
+        """Write all the gates held in a gate buffer.
+
+        Args:
+            gates: Gate buffer to write out
+
+        """
+        self._buf += gates.to_bytes(self._qreg)
+
+    def measure(self, qubits: Iterable[int], bit_register: str) -> None:
+        """Measure the given qubits into consecutive bits of a classical register.
+
+        Args:
+            qubits: Qubit indices to measure
+            bit_register: Name of the classical register receiving the results
+
+        """
+        m_fmt = self._m_fmt.replace(b"c[", bit_register.encode("ascii") + b"[", 1)
+        for i, qubit in enumerate(qubits):
+            self._buf += m_fmt % (i, qubit)
+
+
+class QasmStreamer(QasmBuffer):
+    """Write OpenQASM 3 text for gates as they are emitted.
+
+    The generators only ever emit ``x``, ``cx``, ``ccx`` and ``measure``, so
+    there is no need to build a ``QuantumCircuit`` just to hand it to
+    ``qiskit.qasm3.dumps``. The header goes out first and every gate becomes
+    a preformatted line, producing the same text ``dumps`` would for the
+    equivalent circuit.
+
+    The lines are collected in a ``bytearray`` and written to the file with a
+    single ``write()`` when the streamer is closed, instead of going through
+    the buffered text layer once per gate. The file is only opened then, so
+    it is left untouched if the ``with`` block raises::
+
+        with QasmStreamer(path, 10, {"c": 10}) as qasm:
+            qasm.cx(0, 1)
+
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        n_qubits: int,
+        bit_registers: Mapping[str, int],
+        *,
+        qubit_register: str = "q",
+    ) -> None:
+        """Start the QASM text with the header.
+
+        Args:
+            path: Path of the QASM file to write
+            n_qubits: Number of qubits in the circuit
+            bit_registers: Classical register names and sizes, in declaration order
+            qubit_register: Name of the qubit register (keyword only)
+
+        """
+        super().__init__(qubit_register)
+        self._n_qubits = n_qubits
+        self._path = path
+        self._closed = False
+        self._buf += b'OPENQASM 3.0;\ninclude "stdgates.inc";\n'
+
+        for name, size in bit_registers.items():
+            self._buf += f"bit[{size}] {name};\n".encode("ascii")
+        self._buf += f"qubit[{n_qubits}] {qubit_register};\n".encode("ascii")
+
+    def __enter__(self) -> "QasmStreamer":
+        """Enter the runtime context.
+
+        Returns:
+            QasmStreamer: The streamer itself
+
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write out the QASM text, unless the block raised, and close."""
+        if exc_type is None:
+            self.close()
+        else:
+            self._closed = True
+            self._buf = bytearray()
+
+    def close(self) -> None:
+        """Write out the QASM text to the file."""
+        if self._closed:
+            return
+
+        with self._path.open("wb") as qasm_file:
+            qasm_file.write(self._buf)
+        self._closed = True
+        self._buf = bytearray()
+
+    def measure_all(self, bit_register: str = "meas") -> None:
+        """Add a barrier and measure every qubit, like ``QuantumCircuit.measure_all``.
+
+        Args:
+            bit_register: Name of the classical register receiving the results,
+                which must have one bit per qubit
+
+        """
+        q = self._qreg
+        qubits = ", ".join(f"{q}[{i}]" for i in range(self._n_qubits))
+        self._buf += f"barrier {qubits};\n".encode("ascii")
+        self.measure(range(self._n_qubits), bit_register)
+
+
+class GateBuffer:
+    """Gates stored as parallel arrays instead of one Python object per gate.
+
+    ``ops`` holds the op code of each gate (``OP_X``, ``OP_CX`` or ``OP_CCX``
+    from ``circuit_forge._kernels``) and ``qubits`` its qubit indices, with -1
+    in the slots the gate does not use. The Numba kernels return arrays of
+    this layout.
+    """
+
+    def __init__(
+        self,
+        ops: npt.NDArray[np.uint8],
+        qubits: npt.NDArray[np.int32],
+    ) -> None:
+        """Wrap op code and qubit index arrays, such as a Numba kernel returns.
+
+        Args:
+            ops: Op code of each gate
+            qubits: (M, 3) array of the qubit indices of each gate
+
+        """
+        self.ops = ops
+        self.qubits = qubits
+
+    def to_bytes(self, qubit_register: str = "q") -> bytes:
+        """Format the gates as ASCII QASM statements, one per line.
+
+        Args:
+            qubit_register: Name of the qubit register
+
+        Returns:
+            bytes: QASM text of the gates
+
+        """
+        from circuit_forge._kernels import render_ops  # noqa: PLC0415
+
+        qreg = np.frombuffer(qubit_register.encode("ascii"), np.uint8)
+        return render_ops(self.ops, self.qubits, qreg).tobytes()
+
+
+def qasm_file_path(
+    circuit_type: Literal["adder", "multiplier"],
+    n_qubits: int,
+) -> Path:
+    """Return the path of the QASM file for a circuit, creating ``qasm/`` if needed.
+
+    Args:
+        circuit_type: Type of circuit ("adder" or "multiplier")
+        n_qubits: Number of qubits in the circuit
+
+    Returns:
+        Path: Path of the QASM file
+
+    """
+    _QASM_DIR.mkdir(exist_ok=True)
+
+    return _QASM_DIR / f"{circuit_type}_n{n_qubits}.qasm"
 
 
 def save_qasm_file(
-    qc: QuantumCircuit,
+    qc: "QuantumCircuit",
     circuit_type: Literal["adder", "multiplier"],
     n_qubits: int,
 ) -> Path:
@@ -23,12 +335,26 @@ def save_qasm_file(
         Path: Path to the saved QASM file
 
     """
-    qasm_dir = Path("qasm")
-    if not qasm_dir.is_dir():
-        qasm_dir.mkdir()
+    from qiskit.qasm3 import dumps  # type: ignore[import-untyped]  # noqa: PLC0415
 
-    qasm_path = qasm_dir / f"{circuit_type}_n{n_qubits}.qasm"
+    qasm_path = qasm_file_path(circuit_type, n_qubits)
     with qasm_path.open("w") as qasm_file:
         qasm_file.write(dumps(qc))
 
     return qasm_path
+
+
+def matches_qasm_file(qc: "QuantumCircuit", qasm_path: Path) -> bool:
+    """Check that a QASM file holds exactly what ``qiskit.qasm3.dumps`` gives.
+
+    Args:
+        qc: Quantum circuit the file should describe
+        qasm_path: Path of the QASM file to check
+
+    Returns:
+        bool: True if the file text equals the serialized circuit
+
+    """
+    from qiskit.qasm3 import dumps  # type: ignore[import-untyped]  # noqa: PLC0415
+
+    return qasm_path.read_text(encoding="utf-8") == dumps(qc)
@@ -9,10 +9,14 @@ including:
 
 from pathlib import Path
 
+import numpy as np
 import pytest
 from qiskit import QuantumCircuit
+from qiskit.qasm3 import dumps  # type: ignore[import-untyped]
 
+from circuit_forge._kernels import OP_CCX, OP_CX, OP_X, build_adder_ops  # noqa: PLC2701
 from circuit_forge.adder import (
+    add_bits,
     add_four_bits,
     apply_majority_gate,
     create_quantum_circuit,
@@ -20,8 +24,14 @@ from circuit_forge.adder import (
     main,
     undo_majority_gate,
     validate_qubit_count,
+    write_adder_qasm,
+)
+from circuit_forge.utils import (
+    CircuitAppender,
+    GateBuffer,
+    QasmStreamer,
+    save_qasm_file,
 )
-from circuit_forge.utils import save_qasm_file
 
 
 @pytest.fixture(autouse=True)
@@ -55,13 +65,14 @@ def test_create_quantum_circuit():
     """Test the create_quantum_circuit function."""
     qc, n_qubits = create_quantum_circuit(4)
     assert isinstance(qc, QuantumCircuit)
-    assert n_qubits == 4 * 2 + 2 + (4 / 4) - 1
-    assert qc.num_qubits == 4 * 2 + 2 + (4 / 4) - 1
+    assert isinstance(n_qubits, int)
+    assert n_qubits == 4 * 2 + 2 + (4 // 4) - 1
+    assert qc.num_qubits == 4 * 2 + 2 + (4 // 4) - 1
 
     qc, n_qubits = create_quantum_circuit(8)
     assert isinstance(qc, QuantumCircuit)
-    assert n_qubits == 8 * 2 + 2 + (8 / 4) - 1
-    assert qc.num_qubits == 8 * 2 + 2 + (8 / 4) - 1
+    assert n_qubits == 8 * 2 + 2 + (8 // 4) - 1
+    assert qc.num_qubits == 8 * 2 + 2 + (8 // 4) - 1
 
 
 def test_apply_and_undo_majority_gate():
@@ -95,6 +106,31 @@ def test_initialize_quantum_state():
     assert len(qc.data) > 0
 
 
+def test_initialize_quantum_state_fits_patterns():
+    """Test that short patterns are padded and long ones cut to their last bits."""
+    qc = QuantumCircuit(19)
+
+    initialize_quantum_state(
+        qc,
+        8,
+        a_pattern="1010",
+        b_pattern="111100001",
+        initial_carry=0,
+    )
+
+    targets = [qc.find_bit(instruction.qubits[0]).index for instruction in qc.data]
+    assert targets == [0, 2, 8, 9, 10, 15]
+
+
+def test_initialize_quantum_state_without_operand_bits():
+    """Test that no operand bits are set when there are none to fit to."""
+    qc = QuantumCircuit(1)
+
+    initialize_quantum_state(qc, 0, a_pattern="11", b_pattern="1", initial_carry=0)
+
+    assert len(qc.data) == 0
+
+
 def test_add_four_bits():
     """Test the add_four_bits function."""
     qc = QuantumCircuit(10)
@@ -110,6 +146,42 @@ def test_add_four_bits():
     assert len(qc.data) > 0
 
 
+def test_add_four_bits_matches_majority_gates():
+    """Test that add_four_bits applies the majority and undo-majority gates."""
+    expected = QuantumCircuit(10)
+    apply_majority_gate(expected, 8, 4, 0)
+    apply_majority_gate(expected, 0, 5, 1)
+    apply_majority_gate(expected, 1, 6, 2)
+    apply_majority_gate(expected, 2, 7, 3)
+    expected.cx(3, 9)
+    undo_majority_gate(expected, 2, 7, 3)
+    undo_majority_gate(expected, 1, 6, 2)
+    undo_majority_gate(expected, 0, 5, 1)
+    undo_majority_gate(expected, 8, 4, 0)
+
+    qc = QuantumCircuit(10)
+    add_four_bits(qc, [0, 1, 2, 3], [4, 5, 6, 7], carry_in=8, carry_out=9)
+
+    assert qc == expected
+
+
+def test_add_four_bits_with_circuit_appender():
+    """Test that CircuitAppender builds the same circuit as QuantumCircuit calls."""
+    expected = QuantumCircuit(10)
+    add_four_bits(expected, [0, 1, 2, 3], [4, 5, 6, 7], carry_in=8, carry_out=9)
+
+    qc = QuantumCircuit(10)
+    add_four_bits(
+        CircuitAppender(qc),
+        [0, 1, 2, 3],
+        [4, 5, 6, 7],
+        carry_in=8,
+        carry_out=9,
+    )
+
+    assert qc == expected
+
+
 def test_qasm_file_generation():
     """Test generation of QASM file from an adder circuit."""
     qc, n_qubits = create_quantum_circuit(4)
@@ -136,6 +208,74 @@ def test_qasm_file_generation():
     assert "qubit" in content
 
 
+def test_qasm_streamer_matches_dumps(tmp_path: Path):
+    """Test that QasmStreamer writes the same text as qiskit.qasm3.dumps."""
+    qc, n_qubits = create_quantum_circuit(4)
+    qasm_path = tmp_path / "adder.qasm"
+
+    with QasmStreamer(qasm_path, n_qubits, {"c": n_qubits, "meas": n_qubits}) as qasm:
+        for sink in (qc, qasm):
+            initialize_quantum_state(
+                sink,
+                4,
+                a_pattern="1100",
+                b_pattern="0011",
+                initial_carry=1,
+            )
+            add_four_bits(sink, [0, 1, 2, 3], [4, 5, 6, 7], carry_in=8, carry_out=9)
+            sink.measure_all()
+
+    assert qasm_path.read_text(encoding="utf-8") == dumps(qc)
+
+
+def _stream_until_interrupted(qasm_path: Path) -> None:
+    """Emit a gate into a QasmStreamer, then get interrupted.
+
+    Raises:
+        KeyboardInterrupt: Always, from inside the with block
+
+    """
+    with QasmStreamer(qasm_path, 2, {"c": 2}) as qasm:
+        qasm.cx(0, 1)
+        raise KeyboardInterrupt
+
+
+def test_qasm_streamer_keeps_file_on_error(tmp_path: Path):
+    """Test that QasmStreamer leaves the file alone if the block raises."""
+    qasm_path = tmp_path / "adder.qasm"
+    qasm_path.write_text("previous\n", encoding="utf-8")
+
+    with pytest.raises(KeyboardInterrupt):
+        _stream_until_interrupted(qasm_path)
+
+    assert qasm_path.read_text(encoding="utf-8") == "previous\n"
+
+
+def test_build_adder_ops_matches_add_bits(tmp_path: Path):
+    """Test that the adder kernel generates the same gates as add_bits."""
+    _, n_qubits = create_quantum_circuit(8)
+    expected_path = tmp_path / "expected.qasm"
+    qasm_path = tmp_path / "adder.qasm"
+
+    with QasmStreamer(expected_path, n_qubits, {"c": n_qubits}) as qasm:
+        add_bits(qasm, 8)
+    with QasmStreamer(qasm_path, n_qubits, {"c": n_qubits}) as qasm:
+        qasm.write_gates(GateBuffer(*build_adder_ops(8)))
+
+    expected = expected_path.read_text(encoding="utf-8")
+    assert qasm_path.read_text(encoding="utf-8") == expected
+
+
+def test_gate_buffer():
+    """Test that GateBuffer formats each op code as its gate statement."""
+    ops = np.array([OP_X, OP_CX, OP_CCX], np.uint8)
+    qubits = np.array([[3, -1, -1], [0, 12, -1], [1, 2, 10]], np.int32)
+
+    assert GateBuffer(ops, qubits).to_bytes("r") == (
+        b"x r[3];\ncx r[0], r[12];\nccx r[1], r[2], r[10];\n"
+    )
+
+
 def test_main_integration(monkeypatch: pytest.MonkeyPatch):
     """Test the main function end-to-end."""
     monkeypatch.setattr("sys.argv", ["adder.py", "4"])
@@ -145,3 +285,51 @@ def test_main_integration(monkeypatch: pytest.MonkeyPatch):
     qasm_path = Path("qasm/adder_n10.qasm")
     assert qasm_path.exists()
     assert qasm_path.stat().st_size > 0
+
+
+def test_main_with_numba_kernel(monkeypatch: pytest.MonkeyPatch):
+    """Test that main writes the same file with and without the Numba kernel.
+
+    Without Numba installed, the kernel runs as plain Python.
+    """
+    monkeypatch.setattr("sys.argv", ["adder.py", "8"])
+    qasm_path = Path("qasm/adder_n19.qasm")
+
+    main()
+    expected = qasm_path.read_text(encoding="utf-8")
+
+    monkeypatch.setattr("circuit_forge.adder.NUMBA_AVAILABLE", True)
+    monkeypatch.setattr("circuit_forge.adder._NUMBA_MIN_BITS", 8)
+    main()
+
+    assert qasm_path.read_text(encoding="utf-8") == expected
+
+
+def test_main_validate(monkeypatch: pytest.MonkeyPatch):
+    """Test that main --validate accepts the file it wrote."""
+    monkeypatch.setattr("sys.argv", ["adder.py", "8", "--validate"])
+
+    main()
+
+    assert Path("qasm/adder_n19.qasm").exists()
+
+
+def test_main_validate_detects_mismatch(monkeypatch: pytest.MonkeyPatch):
+    """Test that main --validate fails when the file differs from the circuit."""
+    monkeypatch.setattr("sys.argv", ["adder.py", "4", "--validate"])
+    monkeypatch.setattr(QasmStreamer, "measure_all", lambda _self: None)
+
+    with pytest.raises(SystemExit):
+        main()
+
+
+def test_write_adder_qasm(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that write_adder_qasm writes the file main does, to any path."""
+    qasm_path = tmp_path / "adder.qasm"
+    monkeypatch.setattr("sys.argv", ["adder.py", "8"])
+
+    write_adder_qasm(8, qasm_path)
+    main()
+
+    expected = Path("qasm/adder_n19.qasm").read_text(encoding="utf-8")
+    assert qasm_path.read_text(encoding="utf-8") == expected
@@ -0,0 +1,193 @@
+"""Tests for the quantum multiplier circuit generator."""
+
+from pathlib import Path
+
+import pytest
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.qasm3 import dumps  # type: ignore[import-untyped]
+
+from circuit_forge._kernels import build_multiplier_ops  # noqa: PLC2701
+from circuit_forge.multiplier import (
+    adder,
+    carry,
+    init_bits,
+    main,
+    multiplier,
+    render_multiplier_parallel,
+    uncarry,
+    validate_bit_count,
+    write_multiplier_qasm,
+)
+from circuit_forge.utils import GateBuffer, QasmBuffer, QasmStreamer
+
+
+@pytest.fixture(autouse=True)
+def cleanup_qasm_files():
+    """Fixture to clean up QASM files after tests."""
+    qasm_dir = Path("qasm")
+    if not qasm_dir.is_dir():
+        qasm_dir.mkdir()
+
+    yield
+
+    test_files = [f for f in qasm_dir.iterdir() if f.name.startswith("multiplier_")]
+    for file in test_files:
+        file.unlink()
+    qasm_dir.rmdir()
+
+
+def test_validate_bit_count():
+    """Test the validate_bit_count function."""
+    assert validate_bit_count(1) is True
+    assert validate_bit_count(4) is True
+
+    assert validate_bit_count(0) is False
+    assert validate_bit_count(-1) is False
+
+
+def test_carry_and_uncarry():
+    """Test that uncarry undoes carry."""
+    qc = QuantumCircuit(4)
+
+    carry(qc, 0, 1, 2, 3)
+    uncarry(qc, 0, 1, 2, 3)
+
+    assert qc.inverse() == qc
+
+
+def test_adder():
+    """Test the adder function."""
+    qc = QuantumCircuit(9)
+
+    adder(qc, list(range(9)))
+
+    assert qc.depth() > 0
+    assert len(qc.data) > 0
+
+
+@pytest.mark.parametrize("n_qubits", [10, 11])
+def test_adder_ignores_leftover_qubits(n_qubits: int):
+    """Test that adder leaves out qubits past the last full triplet."""
+    expected = QasmBuffer()
+    adder(expected, list(range(9)))
+    qasm = QasmBuffer()
+
+    adder(qasm, list(range(n_qubits)))
+
+    assert bytes(qasm) == bytes(expected)
+    # Two carries, a carry sum, then two uncarries each with a carry sum
+    assert bytes(qasm).count(b";\n") == 3 * 2 + 2 + (3 + 2) * 2
+
+
+def test_qasm_streamer_matches_dumps(tmp_path: Path):
+    """Test that QasmStreamer writes the same text as qiskit.qasm3.dumps."""
+    n = 3
+    qr = QuantumRegister(5 * n, "q0")
+    cr = ClassicalRegister(n, "c0")
+    qc = QuantumCircuit(qr, cr)
+    qasm_path = tmp_path / "multiplier.qasm"
+
+    with QasmStreamer(qasm_path, 5 * n, {"c0": n}, qubit_register="q0") as qasm:
+        init_bits(qasm, "101", *range(4 * n, 5 * n))
+        multiplier(qasm, list(range(5 * n)))
+        qasm.measure(range(2, 3 * n, 3), "c0")
+
+    init_bits(qc, "101", *range(4 * n, 5 * n))
+    multiplier(qc, list(range(5 * n)))
+    qc.measure(list(range(2, 3 * n, 3)), cr)
+
+    assert qasm_path.read_text(encoding="utf-8") == dumps(qc)
+
+
+@pytest.mark.parametrize("n", [1, 2, 5])
+def test_build_multiplier_ops_matches_multiplier(tmp_path: Path, n: int):
+    """Test that the multiplier kernel generates the same gates as multiplier."""
+    expected_path = tmp_path / "expected.qasm"
+    qasm_path = tmp_path / "multiplier.qasm"
+
+    with QasmStreamer(expected_path, 5 * n, {"c0": n}) as qasm:
+        multiplier(qasm, list(range(5 * n)))
+    with QasmStreamer(qasm_path, 5 * n, {"c0": n}) as qasm:
+        qasm.write_gates(GateBuffer(*build_multiplier_ops(n)))
+
+    expected = expected_path.read_text(encoding="utf-8")
+    assert qasm_path.read_text(encoding="utf-8") == expected
+
+
+def test_render_multiplier_parallel():
+    """Test that the parallel rendering joins the partial products in order."""
+    expected = QasmBuffer("q0")
+    multiplier(expected, list(range(5 * 5)))
+
+    assert render_multiplier_parallel(5, "q0", 2) == bytes(expected)
+
+
+def test_main_integration(monkeypatch: pytest.MonkeyPatch):
+    """Test the main function end-to-end."""
+    monkeypatch.setattr("sys.argv", ["multiplier.py", "4"])
+
+    main()
+
+    qasm_path = Path("qasm/multiplier_n20.qasm")
+    assert qasm_path.exists()
+    assert qasm_path.stat().st_size > 0
+
+
+def test_main_with_numba_kernel(monkeypatch: pytest.MonkeyPatch):
+    """Test that main writes the same file with and without the Numba kernel.
+
+    Without Numba installed, the kernel runs as plain Python.
+    """
+    monkeypatch.setattr("sys.argv", ["multiplier.py", "4"])
+    qasm_path = Path("qasm/multiplier_n20.qasm")
+
+    main()
+    expected = qasm_path.read_text(encoding="utf-8")
+
+    monkeypatch.setattr("circuit_forge.multiplier.NUMBA_AVAILABLE", True)
+    monkeypatch.setattr("circuit_forge.multiplier._NUMBA_MIN_BITS", 4)
+    main()
+
+    assert qasm_path.read_text(encoding="utf-8") == expected
+
+
+def test_main_parallel(monkeypatch: pytest.MonkeyPatch):
+    """Test that main writes the same file with and without worker processes."""
+    monkeypatch.setattr("sys.argv", ["multiplier.py", "4"])
+    qasm_path = Path("qasm/multiplier_n20.qasm")
+
+    main()
+    expected = qasm_path.read_text(encoding="utf-8")
+
+    monkeypatch.setattr("circuit_forge.multiplier._PARALLEL_MIN_BITS", 1)
+    monkeypatch.setattr("circuit_forge.multiplier._BITS_PER_WORKER", 2)
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    main()
+
+    assert qasm_path.read_text(encoding="utf-8") == expected
+
+
+def test_main_validate(monkeypatch: pytest.MonkeyPatch):
+    """Test that main --validate accepts the file it wrote."""
+    monkeypatch.setattr("sys.argv", ["multiplier.py", "4", "--validate"])
+
+    main()
+
+    assert Path("qasm/multiplier_n20.qasm").exists()
+
+
+def test_write_multiplier_qasm(tmp_path: Path):
+    """Test that write_multiplier_qasm writes the streamed multiplier circuit."""
+    n = 3
+    expected_path = tmp_path / "expected.qasm"
+    qasm_path = tmp_path / "multiplier.qasm"
+
+    with QasmStreamer(expected_path, 5 * n, {"c0": n}, qubit_register="q0") as qasm:
+        init_bits(qasm, "011", *range(4 * n, 5 * n))
+        init_bits(qasm, "110", *range(3 * n, 4 * n))
+        multiplier(qasm, list(range(5 * n)))
+        qasm.measure(range(2, 3 * n, 3), "c0")
+    write_multiplier_qasm(n, qasm_path, x_bin="011", y_bin="110")
+
+    expected = expected_path.read_text(encoding="utf-8")
+    assert qasm_path.read_text(encoding="utf-8") == expected